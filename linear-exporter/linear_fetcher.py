@@ -1,56 +1,286 @@
 import os
+import gzip
+import hashlib
+import threading
+import time
 import requests
 import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 
+try:
+    import orjson  # Optional: much faster JSON parse/serialize
+except ImportError:
+    orjson = None
+
 load_dotenv()  # Load environment variables from .env file
 
+# Selection set shared by every comments(...) connection we query.
+# Only fields that linear_to_kapa renders are requested.
+COMMENTS_SELECTION = """
+                    pageInfo {
+                        hasNextPage
+                        endCursor
+                    }
+                    nodes {
+                        id
+                        body
+                        createdAt
+                        user {
+                            name
+                        }
+                        botActor {
+                            name
+                        }
+                    }
+"""
+
+
+def json_loads(data: bytes) -> Any:
+    """
+    Parse JSON bytes, using orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any) -> bytes:
+    """
+    Serialize to compact UTF-8 JSON bytes, using orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def load_export_state(state_file: str) -> Dict[str, Any]:
+    """
+    Load the incremental export checkpoint, or an empty state if there is none
+    """
+    if not os.path.exists(state_file):
+        return {}
+    with open(state_file, "rb") as f:
+        return json_loads(f.read())
+
+
+def save_export_state(state_file: str, state: Dict[str, Any]) -> None:
+    """
+    Atomically write the incremental export checkpoint
+    """
+    tmp_file = f"{state_file}.tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(json_dumps(state))
+    os.replace(tmp_file, state_file)
+
+
+class DiskCache:
+    """
+    Minimal on-disk cache storing one JSON file per key.
+
+    Entries older than ttl seconds count as missing (ttl=None never expires).
+    Writes go through a temp file and an atomic rename, so concurrent threads
+    never read a partially written entry.
+    """
+
+    def __init__(self, directory: str, ttl: Optional[float] = None):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            if self.ttl is not None and time.time() - os.path.getmtime(path) > self.ttl:
+                return None
+            with open(path, "rb") as f:
+                return json_loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(json_dumps(value))
+        os.replace(tmp_path, path)
+
+
 class LinearAPIClient:
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        cache_dir: Optional[str] = None,
+        cache_ttl: float = 600,
+        comments_cache_dir: Optional[str] = None,
+        verbose: bool = False,
+    ):
         """
         Initialize Linear API client
 
         Args:
             api_key: Your Linear API key (personal or OAuth token)
+            cache_dir: Optional directory for caching query responses on disk
+            cache_ttl: Seconds a cached response stays valid (default: 600)
+            comments_cache_dir: Optional directory for a persistent cache of
+                paginated comment threads, keyed by issue ID + updatedAt
+            verbose: Print a line per ticket instead of periodic progress
         """
         self.api_key = api_key
+        self.verbose = verbose
         self.base_url = "https://api.linear.app/graphql"
         self.headers = {
             "Authorization": api_key,
             "Content-Type": "application/json",
         }
 
-    def _execute_query(self, query: str, variables: Optional[Dict] = None) -> Dict[str, Any]:
+        # One pooled session for every request: keep-alive avoids a fresh
+        # TCP + TLS handshake per GraphQL call. GraphQL reads are safe to
+        # retry, so POST is allowed on transient 5xx responses. Rate limits
+        # (429 / RATELIMITED) are handled in _execute_query from Linear's
+        # rate-limit headers instead.
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        retries = Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=frozenset({"POST"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retries)
+        self.session.mount("https://", adapter)
+
+        # Optional response cache, keyed by a hash of API key + query +
+        # variables, so a different key never sees another key's responses.
+        # Mostly useful when re-running exports during development.
+        self.cache = DiskCache(cache_dir, ttl=cache_ttl) if cache_dir else None
+        self._cache_namespace = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+        # Comment threads that needed extra requests, keyed by issue ID and
+        # updatedAt. Any change to the issue (including a new comment) bumps
+        # updatedAt, so entries never need to expire.
+        self.comments_cache = DiskCache(comments_cache_dir) if comments_cache_dir else None
+
+        # Shared across worker threads: when the request budget runs low (or
+        # we get rate limited) every thread waits until the window resets.
+        self.rate_limit_threshold = 5
+        self.max_rate_limit_retries = 5
+        self._rate_limit_lock = threading.Lock()
+        self._resume_at = 0.0
+
+    def _wait_for_rate_limit(self) -> None:
+        """
+        Sleep until the current rate-limit pause (if any) is over
+        """
+        delay = self._resume_at - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _pause_until(self, resume_at: float) -> None:
+        """
+        Hold all requests until resume_at (a Unix timestamp)
+        """
+        with self._rate_limit_lock:
+            self._resume_at = max(self._resume_at, resume_at)
+
+    @staticmethod
+    def _rate_limit_reset(response: requests.Response) -> Optional[float]:
+        """
+        Read the request window reset time from Linear's headers as a Unix timestamp
+        """
+        reset = response.headers.get("X-RateLimit-Requests-Reset")
+        if not reset:
+            return None
+        try:
+            reset_at = float(reset)
+        except ValueError:
+            return None
+        # Linear sends milliseconds since the epoch
+        return reset_at / 1000 if reset_at > 1e11 else reset_at
+
+    @staticmethod
+    def _is_rate_limited(response: requests.Response) -> bool:
+        """
+        Linear signals rate limiting with a 429 or a RATELIMITED GraphQL error
+        """
+        if response.status_code == 429:
+            return True
+        return response.status_code == 400 and "RATELIMITED" in response.text
+
+    def _execute_query(
+        self, query: str, variables: Optional[Dict] = None, use_cache: bool = True
+    ) -> Dict[str, Any]:
         """
         Execute a GraphQL query against the Linear API
 
         Args:
             query: GraphQL query string
             variables: Optional query variables
+            use_cache: Set to False to always hit the API (and not store the
+                response), e.g. for connection checks and diagnostics
 
         Returns:
             Response data dict
         """
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = hashlib.md5(
+                (self._cache_namespace + query + json.dumps(variables, sort_keys=True)).encode("utf-8")
+            ).hexdigest()
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         payload: Dict[str, Any] = {"query": query}
         if variables:
             payload["variables"] = variables
 
-        response = requests.post(self.base_url, headers=self.headers, json=payload)
+        for attempt in range(self.max_rate_limit_retries + 1):
+            self._wait_for_rate_limit()
+            response = self.session.post(self.base_url, json=payload)
+            reset_at = self._rate_limit_reset(response)
+
+            if self._is_rate_limited(response) and attempt < self.max_rate_limit_retries:
+                retry_after = response.headers.get("Retry-After")
+                if retry_after and retry_after.isdigit():
+                    resume_at = time.time() + int(retry_after)
+                elif reset_at:
+                    resume_at = reset_at
+                else:
+                    resume_at = time.time() + 2 ** attempt
+                print(f"  Rate limited by Linear, retrying in {max(resume_at - time.time(), 0):.0f}s...")
+                self._pause_until(resume_at)
+                continue
+
+            # Slow down before hitting the limit rather than after
+            remaining = response.headers.get("X-RateLimit-Requests-Remaining")
+            if reset_at and remaining and remaining.isdigit() and int(remaining) < self.rate_limit_threshold:
+                self._pause_until(reset_at)
+            break
 
         if response.status_code != 200:
             raise Exception(
                 f"API request failed: {response.status_code} - {response.text}"
             )
 
-        result = response.json()
+        result = json_loads(response.content)
 
         if "errors" in result:
             error_messages = "; ".join(e.get("message", "Unknown error") for e in result["errors"])
             raise Exception(f"GraphQL errors: {error_messages}")
 
-        return result.get("data", {})
+        data = result.get("data", {})
+        if cache_key is not None:
+            self.cache.set(cache_key, data)
+        return data
 
     def test_connection(self) -> Dict[str, Any]:
         """
@@ -69,12 +299,14 @@ class LinearAPIClient:
             }
         }
         """
-        return self._execute_query(query)
+        # Always hit the API: a cached answer would hide a revoked key
+        return self._execute_query(query, use_cache=False)
 
     def fetch_closed_issues(
         self,
         days_back: int = 180,
         team_id: Optional[str] = None,
+        updated_after: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """
         Fetch all completed/cancelled issues from the last N days using cursor pagination.
@@ -82,11 +314,16 @@ class LinearAPIClient:
         Args:
             days_back: Number of days to look back
             team_id: Optional team ID to filter by
+            updated_after: Optional ISO timestamp; only issues updated strictly
+                after it are returned (used for incremental exports)
 
         Returns:
             List of issue dicts
         """
         cutoff_date = (datetime.now(timezone.utc) - timedelta(days=days_back)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        updated_filter: Dict[str, str] = {"gte": cutoff_date}
+        if updated_after and updated_after > cutoff_date:
+            updated_filter = {"gt": updated_after}
 
         # Build filter based on FETCH_ALL_STATES mode.
         # Default (production): only completed/canceled issues.
@@ -96,11 +333,11 @@ class LinearAPIClient:
         if fetch_all:
             print("  (FETCH_ALL_STATES is ON — fetching issues in any state)")
             issue_filter: Dict[str, Any] = {
-                "updatedAt": {"gte": cutoff_date},
+                "updatedAt": updated_filter,
             }
         else:
             issue_filter: Dict[str, Any] = {
-                "updatedAt": {"gte": cutoff_date},
+                "updatedAt": updated_filter,
                 "state": {
                     "type": {"in": ["completed", "canceled"]},
                 },
@@ -112,7 +349,7 @@ class LinearAPIClient:
         query FetchClosedIssues($filter: IssueFilter!, $after: String) {
             issues(
                 filter: $filter,
-                first: 50,
+                first: 100,
                 after: $after,
                 orderBy: updatedAt
             ) {
@@ -126,50 +363,37 @@ class LinearAPIClient:
                     number
                     title
                     description
-                    descriptionState
                     url
-                    priority
                     priorityLabel
                     createdAt
                     updatedAt
                     completedAt
-                    canceledAt
                     state {
-                        id
                         name
                         type
                     }
                     team {
-                        id
                         name
-                        key
                     }
                     assignee {
-                        id
                         name
-                        email
                     }
                     creator {
-                        id
                         name
-                        email
                     }
-                    labels {
+                    labels(first: 20) {
                         nodes {
-                            id
                             name
-                            color
                         }
                     }
                     project {
-                        id
                         name
                     }
                     cycle {
-                        id
                         name
                         number
                     }
+                    comments(first: 20) {""" + COMMENTS_SELECTION + """                    }
                 }
             }
         }
@@ -183,7 +407,9 @@ class LinearAPIClient:
             if cursor:
                 variables["after"] = cursor
 
-            data = self._execute_query(query, variables)
+            # Never cached: an incremental run's filter is the same between
+            # runs, and a cached page would hide newly updated issues
+            data = self._execute_query(query, variables, use_cache=False)
             issues_data = data.get("issues", {})
             nodes = issues_data.get("nodes", [])
 
@@ -201,12 +427,16 @@ class LinearAPIClient:
 
         return all_issues
 
-    def fetch_issue_comments(self, issue_id: str) -> List[Dict[str, Any]]:
+    def fetch_issue_comments(
+        self, issue_id: str, after: Optional[str] = None, use_cache: bool = True
+    ) -> List[Dict[str, Any]]:
         """
         Fetch all comments for a specific issue
 
         Args:
             issue_id: The Linear issue ID
+            after: Optional cursor to resume from (skips earlier pages)
+            use_cache: Set to False to bypass the response cache
 
         Returns:
             List of comment dicts
@@ -214,39 +444,20 @@ class LinearAPIClient:
         query = """
         query FetchComments($issueId: String!, $after: String) {
             issue(id: $issueId) {
-                comments(first: 100, after: $after) {
-                    pageInfo {
-                        hasNextPage
-                        endCursor
-                    }
-                    nodes {
-                        id
-                        body
-                        createdAt
-                        updatedAt
-                        user {
-                            id
-                            name
-                            email
-                        }
-                        botActor {
-                            name
-                        }
-                    }
-                }
+                comments(first: 250, after: $after) {""" + COMMENTS_SELECTION + """                }
             }
         }
         """
 
         all_comments: List[Dict[str, Any]] = []
-        cursor: Optional[str] = None
+        cursor: Optional[str] = after
 
         while True:
             variables: Dict[str, Any] = {"issueId": issue_id}
             if cursor:
                 variables["after"] = cursor
 
-            data = self._execute_query(query, variables)
+            data = self._execute_query(query, variables, use_cache=use_cache)
             issue_data = data.get("issue", {})
             if not issue_data:
                 break
@@ -267,10 +478,66 @@ class LinearAPIClient:
 
         return all_comments
 
+    def fetch_comments_batch(
+        self,
+        issue_ids: List[str],
+        after: Optional[Dict[str, Optional[str]]] = None,
+        use_cache: bool = True,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Fetch comments for several issues in a single GraphQL request.
+
+        Each issue becomes an aliased ``issue(id:)`` field, so a batch costs
+        one round trip instead of one per issue. Issues whose first page
+        reports more comments continue through fetch_issue_comments.
+
+        Args:
+            issue_ids: Linear issue IDs to fetch comments for
+            after: Optional map of issue ID to the cursor to resume from
+            use_cache: Set to False to bypass the response cache
+
+        Returns:
+            Dict mapping issue ID to its list of comment dicts
+        """
+        after = after or {}
+        var_defs = ", ".join(
+            f"$id{n}: String!, $after{n}: String" for n in range(len(issue_ids))
+        )
+        fields = "".join(
+            f"""
+            i{n}: issue(id: $id{n}) {{
+                comments(first: 100, after: $after{n}) {{""" + COMMENTS_SELECTION + """                }
+            }"""
+            for n in range(len(issue_ids))
+        )
+        query = f"query FetchCommentsBatch({var_defs}) {{{fields}\n}}"
+        variables: Dict[str, Any] = {}
+        for n, issue_id in enumerate(issue_ids):
+            variables[f"id{n}"] = issue_id
+            variables[f"after{n}"] = after.get(issue_id)
+
+        data = self._execute_query(query, variables, use_cache=use_cache)
+
+        all_comments: Dict[str, List[Dict[str, Any]]] = {}
+        for n, issue_id in enumerate(issue_ids):
+            comments_data = (data.get(f"i{n}") or {}).get("comments", {})
+            comments = comments_data.get("nodes", [])
+
+            page_info = comments_data.get("pageInfo", {})
+            if page_info.get("hasNextPage") and page_info.get("endCursor"):
+                comments = comments + self.fetch_issue_comments(
+                    issue_id, after=page_info["endCursor"], use_cache=use_cache
+                )
+
+            all_comments[issue_id] = comments
+
+        return all_comments
+
     def diagnose(self) -> None:
         """
         Print a summary of teams, workflow states, and recent issue counts
         so you can see what's actually in your Linear workspace.
+        Always queries the API; diagnostics should never show cached data.
         """
         # Teams
         data = self._execute_query("""
@@ -279,7 +546,7 @@ class LinearAPIClient:
                 nodes { id name key issueCount }
             }
         }
-        """)
+        """, use_cache=False)
         teams = data.get("teams", {}).get("nodes", [])
         print(f"\n{'='*50}")
         print("DIAGNOSTIC: Your Linear workspace")
@@ -295,7 +562,7 @@ class LinearAPIClient:
                 nodes { id name type team { key } }
             }
         }
-        """)
+        """, use_cache=False)
         states = data.get("workflowStates", {}).get("nodes", [])
         print(f"\nWorkflow states ({len(states)}):")
         for s in states:
@@ -315,7 +582,7 @@ class LinearAPIClient:
                 }
             }
         }
-        """)
+        """, use_cache=False)
         recent = data.get("issues", {}).get("nodes", [])
         print(f"\n5 most recently updated issues:")
         for iss in recent:
@@ -325,16 +592,136 @@ class LinearAPIClient:
 
         print(f"\n{'='*50}\n")
 
-    def fetch_all_closed_tickets(self, days_back: int = 180, team_id: Optional[str] = None) -> Dict[str, Any]:
+    @staticmethod
+    def _comments_cache_key(issue: Dict[str, Any]) -> str:
+        return hashlib.md5(f"{issue['id']}:{issue.get('updatedAt', '')}".encode("utf-8")).hexdigest()
+
+    def _fetch_ticket(
+        self,
+        issue: Dict[str, Any],
+        comments: Optional[List[Dict[str, Any]]] = None,
+        after: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Fetch the remaining comments for a single issue and wrap it as an
+        export ticket.
+
+        Errors are recorded on the ticket instead of raised, so one failing
+        issue doesn't abort the whole export.
+        """
+        comments = comments or []
+        try:
+            # Threads stored in the comments cache must come from live
+            # responses, or a stale page would be kept under the new version
+            comments = comments + self.fetch_issue_comments(
+                issue["id"], after=after, use_cache=self.comments_cache is None
+            )
+            return {
+                "issue": issue,
+                "comments": comments,
+                "total_comments": len(comments),
+            }
+        except Exception as e:
+            # Still include the issue, with whatever comments we already have
+            return {
+                "issue": issue,
+                "comments": comments,
+                "total_comments": len(comments),
+                "error": str(e),
+            }
+
+    def _fetch_tickets_batch(self, issues: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Complete the comments for a batch of issues and wrap them as export
+        tickets.
+
+        Issues from fetch_closed_issues carry their first page of comments
+        inline, so only issues with more pages (or no inline comments) need
+        a request, and those share one batched query. If that request fails
+        (e.g. one issue in it errors), fall back to fetching each of them on
+        its own so the failure stays isolated.
+        """
+        known: Dict[str, List[Dict[str, Any]]] = {}
+        pending: Dict[str, Optional[str]] = {}
+
+        for issue in issues:
+            inline = issue.pop("comments", None)
+            if inline is None:
+                known[issue["id"]] = []
+                pending[issue["id"]] = None
+            else:
+                known[issue["id"]] = inline.get("nodes", [])
+                page_info = inline.get("pageInfo", {})
+                if page_info.get("hasNextPage") and page_info.get("endCursor"):
+                    pending[issue["id"]] = page_info["endCursor"]
+
+            # A full thread cached for this exact issue version saves the requests
+            if issue["id"] in pending and self.comments_cache is not None:
+                cached = self.comments_cache.get(self._comments_cache_key(issue))
+                if cached is not None:
+                    known[issue["id"]] = cached
+                    del pending[issue["id"]]
+
+        fetched: Dict[str, List[Dict[str, Any]]] = {}
+        if pending:
+            try:
+                fetched = self.fetch_comments_batch(
+                    list(pending), after=pending, use_cache=self.comments_cache is None
+                )
+            except Exception:
+                pass
+
+        tickets = []
+        for issue in issues:
+            issue_id = issue["id"]
+            if issue_id in pending and issue_id not in fetched:
+                ticket = self._fetch_ticket(issue, known[issue_id], pending[issue_id])
+            else:
+                comments = known[issue_id] + fetched.get(issue_id, [])
+                ticket = {
+                    "issue": issue,
+                    "comments": comments,
+                    "total_comments": len(comments),
+                }
+
+            if issue_id in pending and "error" not in ticket and self.comments_cache is not None:
+                self.comments_cache.set(self._comments_cache_key(issue), ticket["comments"])
+            tickets.append(ticket)
+
+        return tickets
+
+    def fetch_all_closed_tickets(
+        self,
+        output_filename: str,
+        days_back: int = 180,
+        team_id: Optional[str] = None,
+        max_workers: int = 16,
+        batch_size: int = 25,
+        state_file: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """
-        Fetch all closed/completed tickets with comments and full metadata.
+        Fetch all closed/completed tickets with comments and full metadata,
+        streaming them to a newline-delimited JSON (NDJSON) file as they arrive.
+
+        The first line is {"metadata": {...}}; every following line is one
+        ticket, in the order its batch completed. Nothing is collected in
+        memory, so usage stays flat regardless of how many tickets the export
+        covers. A filename ending in ".gz" is gzip-compressed on the fly.
+
+        When state_file is given the export is incremental: only issues
+        updated since the checkpoint stored there are fetched, and the
+        checkpoint is advanced once the export has been written.
 
         Args:
+            output_filename: Path of the NDJSON file to write (.ndjson or .ndjson.gz)
             days_back: Number of days to look back (default: 180)
             team_id: Optional team ID to restrict to
+            max_workers: Number of concurrent comment fetches (default: 16)
+            batch_size: Number of issues per batched comments query (default: 25)
+            state_file: Optional path of the incremental export checkpoint
 
         Returns:
-            Complete dataset of closed tickets with comments
+            Export metadata (also written to the file)
         """
         end_date = datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=days_back)
@@ -343,63 +730,95 @@ class LinearAPIClient:
             f"Fetching completed issues from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}"
         )
 
+        state = load_export_state(state_file) if state_file else {}
+        updated_after = state.get("last_updated_at")
+        if updated_after:
+            print(f"Incremental export: only issues updated after {updated_after}")
+
         # Fetch all completed issues
         print("Querying Linear for completed issues...")
-        all_issues = self.fetch_closed_issues(days_back=days_back, team_id=team_id)
+        all_issues = self.fetch_closed_issues(
+            days_back=days_back, team_id=team_id, updated_after=updated_after
+        )
         print(f"Found {len(all_issues)} completed issues")
 
-        # Fetch comments for each issue
-        print(f"\nFetching comments for {len(all_issues)} issues...")
-        all_tickets = []
-
-        for i, issue in enumerate(all_issues, 1):
-            issue_id = issue.get("id")
-            identifier = issue.get("identifier", issue_id)
+        # Cursor pagination over updatedAt can return an issue twice if it is
+        # updated mid-export; keep one copy (the latest) per ID
+        issues = list({issue["id"]: issue for issue in all_issues if issue.get("id")}.values())
 
-            if not issue_id:
-                continue
-
-            try:
-                print(f"  Processing {i}/{len(all_issues)}: {identifier}")
-                comments = self.fetch_issue_comments(issue_id)
-
-                complete_ticket = {
-                    "issue": issue,
-                    "comments": comments,
-                    "total_comments": len(comments),
-                }
-
-                all_tickets.append(complete_ticket)
-                print(f"    Done ({len(comments)} comments)")
-
-            except Exception as e:
-                print(f"    Error: {str(e)}")
-                # Still include the issue, just without comments
-                all_tickets.append({
-                    "issue": issue,
-                    "comments": [],
-                    "total_comments": 0,
-                    "error": str(e),
-                })
-
-        result = {
-            "metadata": {
-                "total_tickets": len(all_tickets),
-                "date_range": {
-                    "start": start_date.isoformat(),
-                    "end": end_date.isoformat(),
-                },
-                "fetched_at": datetime.now(timezone.utc).isoformat(),
-                "days_back": days_back,
-                "source": "linear",
+        metadata = {
+            "total_tickets": len(issues),
+            "date_range": {
+                "start": start_date.isoformat(),
+                "end": end_date.isoformat(),
             },
-            "tickets": all_tickets,
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+            "days_back": days_back,
+            "updated_after": updated_after,
+            "source": "linear",
         }
 
+        # Complete comments in batches of aliased queries (most issues need no
+        # request at all). The work is I/O-bound, so a thread pool overlaps
+        # the round trips. Batches are written in completion order, so one
+        # slow batch never holds finished ones back in memory.
+        # Only this thread writes to the file, so no locking is needed.
+        batches = [issues[n:n + batch_size] for n in range(0, len(issues), batch_size)]
         print(
-            f"\n✅ Successfully fetched {len(all_tickets)} completed tickets with comments"
+            f"\nFetching comments for {len(issues)} issues "
+            f"({len(batches)} batches, {max_workers} workers)..."
         )
-        return result
+        written = 0
+        failed_updated_at = []
+
+        opener = gzip.open if output_filename.endswith(".gz") else open
+        with opener(output_filename, "wb") as f, \
+                ThreadPoolExecutor(max_workers=max_workers) as executor:
+            f.write(json_dumps({"metadata": metadata}) + b"\n")
+
+            futures = [executor.submit(self._fetch_tickets_batch, batch) for batch in batches]
+            for future in as_completed(futures):
+                for ticket in future.result():
+                    f.write(json_dumps(ticket) + b"\n")
+                    written += 1
+
+                    issue = ticket["issue"]
+                    identifier = issue.get("identifier", issue["id"])
+
+                    # Errors are always reported; everything else is either a
+                    # line per ticket (verbose) or a line every 50 tickets
+                    if self.verbose:
+                        print(f"  Processed {written}/{len(issues)}: {identifier}")
+                        if "error" not in ticket:
+                            print(f"    Done ({ticket['total_comments']} comments)")
+                    elif written % 50 == 0:
+                        print(f"  Processed {written}/{len(issues)} tickets...")
+                    if "error" in ticket:
+                        print(f"    Error ({identifier}): {ticket['error']}")
+                        failed_updated_at.append(issue["updatedAt"])
+
+        # Only advance the checkpoint once the export is safely on disk, and
+        # never past a ticket that failed: the next run has to pick it up
+        # again to complete its comments
+        if state_file and issues:
+            checkpoint_candidates = [
+                issue["updatedAt"]
+                for issue in issues
+                if not failed_updated_at or issue["updatedAt"] < min(failed_updated_at)
+            ]
+            if failed_updated_at:
+                print(
+                    f"⚠️  {len(failed_updated_at)} tickets failed; the next incremental "
+                    f"run will fetch them again"
+                )
+            if checkpoint_candidates:
+                state["last_updated_at"] = max(checkpoint_candidates)
+                save_export_state(state_file, state)
+
+        print(
+            f"\n✅ Successfully fetched {written} completed tickets with comments"
+        )
+        return metadata
 
 
 def main():
@@ -418,7 +837,17 @@ def main():
     # Optional: restrict to a specific team
     TEAM_ID = os.environ.get("LINEAR_TEAM_ID", None)
 
-    client = LinearAPIClient(API_KEY)
+    # Query responses are cached on disk for LINEAR_CACHE_TTL seconds and
+    # long comment threads per issue version; set LINEAR_NO_CACHE=1 to
+    # always hit the API
+    no_cache = os.environ.get("LINEAR_NO_CACHE", "").lower() in ("true", "1", "yes")
+    client = LinearAPIClient(
+        API_KEY,
+        cache_dir=None if no_cache else ".linear_cache",
+        cache_ttl=float(os.environ.get("LINEAR_CACHE_TTL", "600")),
+        comments_cache_dir=None if no_cache else ".linear_comments_cache",
+        verbose=os.environ.get("LINEAR_VERBOSE", "").lower() in ("true", "1", "yes"),
+    )
 
     try:
         # Test connection
@@ -434,27 +863,36 @@ def main():
 
         # Fetch all completed tickets (last 180 days)
         days_back = int(os.environ.get("LINEAR_DAYS_BACK", "180"))
-        all_data = client.fetch_all_closed_tickets(days_back=days_back, team_id=TEAM_ID)
+        max_workers = int(os.environ.get("LINEAR_MAX_WORKERS", "16"))
+
+        # Optional: incremental mode only exports issues updated since the last run
+        incremental = os.environ.get("LINEAR_INCREMENTAL", "").lower() in ("true", "1", "yes")
+        state_file = (
+            os.environ.get("LINEAR_STATE_FILE", ".linear_export_state.json")
+            if incremental
+            else None
+        )
 
-        # Save to JSON
+        # Tickets are streamed straight to compressed NDJSON as they are fetched
         output_filename = (
-            f"linear_closed_tickets_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            f"linear_closed_tickets_{datetime.now().strftime('%Y%m%d_%H%M%S')}.ndjson.gz"
+        )
+        metadata = client.fetch_all_closed_tickets(
+            output_filename,
+            days_back=days_back,
+            team_id=TEAM_ID,
+            max_workers=max_workers,
+            state_file=state_file,
         )
-        with open(output_filename, "w", encoding="utf-8") as f:
-            json.dump(all_data, f, indent=2, ensure_ascii=False)
 
         print(f"\n💾 Data saved to: {output_filename}")
         print(f"📊 Summary:")
-        print(f"   Total completed tickets: {all_data['metadata']['total_tickets']}")
+        print(f"   Total completed tickets: {metadata['total_tickets']}")
         print(
-            f"   Date range: {all_data['metadata']['date_range']['start'][:10]} to "
-            f"{all_data['metadata']['date_range']['end'][:10]}"
+            f"   Date range: {metadata['date_range']['start'][:10]} to "
+            f"{metadata['date_range']['end'][:10]}"
         )
 
-        if all_data["tickets"]:
-            sample = all_data["tickets"][0]
-            print(f"   Sample issue keys: {list(sample['issue'].keys())}")
-
     except Exception as e:
         print(f"❌ Error: {str(e)}")
 
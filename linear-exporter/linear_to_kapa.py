@@ -1,8 +1,25 @@
+import gzip
 import json
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Any
+from functools import lru_cache
+from itertools import count, islice, repeat
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+
+try:
+    import orjson  # Optional: much faster JSON parse/serialize
+except ImportError:
+    orjson = None
+
+# Tickets handed to the worker processes at a time when streaming an export
+CONVERT_CHUNK_SIZE = 1024
+
+# Patterns used by clean_filename, compiled once for the whole export
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+_UNSAFE_CHARS_RE = re.compile(r'[<>:"/\\|?*]')
+_WHITESPACE_RE = re.compile(r"\s+")
 
 
 def clean_filename(filename: str) -> str:
@@ -10,14 +27,15 @@ def clean_filename(filename: str) -> str:
     Clean filename to be filesystem-safe
     """
     # Remove HTML tags if any
-    filename = re.sub(r"<[^>]+>", "", filename)
+    filename = _HTML_TAG_RE.sub("", filename)
     # Replace problematic characters
-    filename = re.sub(r'[<>:"/\\|?*]', "_", filename)
+    filename = _UNSAFE_CHARS_RE.sub("_", filename)
     # Remove extra whitespace and truncate
-    filename = re.sub(r"\s+", "_", filename.strip())
+    filename = _WHITESPACE_RE.sub("_", filename.strip())
     return filename[:100]
 
 
+@lru_cache(maxsize=16384)
 def format_timestamp(iso_str: str) -> str:
     """
     Convert ISO timestamp to a readable format: 2026-02-17 16:29 UTC
@@ -31,7 +49,170 @@ def format_timestamp(iso_str: str) -> str:
         return iso_str
 
 
-def convert_linear_to_kapa_format(input_file: str, output_dir: str = "linear_tickets"):
+def json_loads(data: bytes) -> Any:
+    """
+    Parse JSON bytes, using orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def read_linear_export(input_file: str) -> Tuple[Dict[str, Any], Iterator[Dict[str, Any]]]:
+    """
+    Open a linear_fetcher export and return (metadata, tickets iterator).
+
+    NDJSON exports (.ndjson / .jsonl, optionally .gz) are read one line at a
+    time, so the whole export never has to fit in memory. Older exports
+    written as a single JSON document are still supported.
+    """
+    name = input_file[:-3] if input_file.endswith(".gz") else input_file
+    opener = gzip.open if input_file.endswith(".gz") else open
+
+    if not name.endswith((".ndjson", ".jsonl")):
+        with opener(input_file, "rb") as f:
+            linear_data = json_loads(f.read())
+        return linear_data.get("metadata", {}), iter(linear_data.get("tickets", []))
+
+    f = opener(input_file, "rb")
+    first_line = f.readline()
+    first = json_loads(first_line) if first_line.strip() else {}
+
+    def tickets() -> Iterator[Dict[str, Any]]:
+        with f:
+            if first_line.strip() and "metadata" not in first:
+                yield first
+            for line in f:
+                if line.strip():
+                    yield json_loads(line)
+
+    return first.get("metadata", {}), tickets()
+
+
+def format_comment(comment: Dict[str, Any]) -> str:
+    """
+    Render a comment as a bold author name followed by its body
+    """
+    comment_body = comment.get("body", "")
+    comment_user = comment.get("user", {}) or {}
+    bot_actor = comment.get("botActor", {}) or {}
+
+    # Determine author
+    if bot_actor.get("name"):
+        author_name = f"{bot_actor['name']} (Bot)"
+    elif comment_user.get("name"):
+        author_name = comment_user["name"]
+    else:
+        author_name = "Unknown"
+
+    return f"**{author_name}**: {comment_body if comment_body else '_No body content._'}"
+
+
+def _convert_ticket(ticket: Dict[str, Any], i: int, output_dir: str) -> Optional[Dict[str, str]]:
+    """
+    Write the markdown file for a single ticket and return its index entry.
+
+    Returns None when the issue has no URL (nothing to index) or when the
+    ticket could not be converted.
+    """
+    try:
+        issue = ticket.get("issue", {})
+        comments = ticket.get("comments", [])
+
+        # Basic issue info
+        identifier = issue.get("identifier", f"ISSUE-{i}")
+        number = issue.get("number", i)
+        title = issue.get("title", f"Issue {number}")
+        description = issue.get("description", "")
+        url = issue.get("url", "")
+        created_at = issue.get("createdAt", "")
+        completed_at = issue.get("completedAt", "")
+        priority_label = issue.get("priorityLabel", "")
+
+        # State info
+        state_info = issue.get("state", {})
+        state_name = state_info.get("name", "Unknown")
+
+        # Team info
+        team_info = issue.get("team", {})
+        team_name = team_info.get("name", "")
+
+        # Assignee / Creator
+        assignee = issue.get("assignee", {}) or {}
+        creator = issue.get("creator", {}) or {}
+
+        # Labels
+        labels_data = issue.get("labels", {}).get("nodes", [])
+        label_names = [l.get("name", "") for l in labels_data if l.get("name")]
+
+        # Project / Cycle
+        project = issue.get("project", {}) or {}
+        cycle = issue.get("cycle", {}) or {}
+
+        # Create filename
+        filename = f"{identifier}_{clean_filename(title)}.md"
+        filepath = os.path.join(output_dir, filename)
+
+        # ── Build markdown following Kapa best practices ──
+        # Modelled after the support ticket example in:
+        # https://docs.kapa.ai/data-sources/faq#how-should-i-format-markdown-files-for-ai-ingestion
+        # Each section is a paragraph; they're joined once with blank lines.
+
+        # Metadata as bold key-value pairs (Kapa recommended style),
+        # skipping optional fields that are empty
+        metadata = [
+            f"**Timestamp**: {format_timestamp(created_at)}",
+            f"**Status**: {state_name}",
+            f"**Completed**: {format_timestamp(completed_at)}" if completed_at else "",
+            f"**Team**: {team_name}" if team_name else "",
+            f"**Priority**: {priority_label}" if priority_label else "",
+            f"**Assignee**: {assignee['name']}" if assignee.get("name") else "",
+            f"**Creator**: {creator['name']}" if creator.get("name") else "",
+            f"**Tags**: {', '.join(label_names)}" if label_names else "",
+            f"**Project**: {project['name']}" if project.get("name") else "",
+            f"**Cycle**: {cycle['name']} (#{cycle.get('number', '')})" if cycle.get("name") else "",
+        ]
+
+        sections = [
+            # H1 — ticket header
+            f"# Linear Issue: {identifier} — {title}",
+            *(field for field in metadata if field),
+            # H2 — Issue description
+            "## Issue description",
+            description or "No description provided.",
+        ]
+
+        # H2 — Conversation (comments)
+        if comments:
+            sections.append("## Conversation")
+            sections.extend(format_comment(comment) for comment in comments)
+
+        # Write the markdown file
+        full_markdown = "\n\n".join(sections) + "\n"
+
+        # Encode once and write the bytes in a single call, skipping the
+        # text-mode wrapper (and its newline translation on Windows)
+        with open(filepath, "wb") as f:
+            f.write(full_markdown.encode("utf-8"))
+
+        # Add to Kapa index (flat format: object_key + source_url)
+        if url:
+            return {
+                "object_key": filename,
+                "source_url": url,
+            }
+        return None
+
+    except Exception as e:
+        print(f"  Error processing ticket {i}: {str(e)}")
+        return None
+
+
+def convert_linear_to_kapa_format(
+    input_file: str,
+    output_dir: str = "linear_tickets",
+    max_workers: Optional[int] = None,
+):
     """
     Convert Linear JSON export to Kapa.ai S3 storage format.
 
@@ -45,160 +226,90 @@ def convert_linear_to_kapa_format(input_file: str, output_dir: str = "linear_tic
 
     See: https://docs.kapa.ai/data-sources/faq#how-should-i-format-markdown-files-for-ai-ingestion
     See: https://docs.kapa.ai/data-sources/s3-storage#best-practices
+
+    Args:
+        input_file: Path to the Linear export (.ndjson.gz, .ndjson or .json)
+        output_dir: Directory to create the Kapa.ai format files
+        max_workers: Number of worker processes (default: one per CPU)
     """
 
     # Create output directory
     os.makedirs(output_dir, exist_ok=True)
 
-    # Load the Linear data
-    with open(input_file, "r", encoding="utf-8") as f:
-        linear_data = json.load(f)
+    # Load the Linear data (streamed for NDJSON exports)
+    metadata, tickets = read_linear_export(input_file)
+    total = metadata.get("total_tickets", "?")
 
-    tickets = linear_data.get("tickets", [])
-
-    print(f"Converting {len(tickets)} tickets to Kapa.ai format...")
+    print(f"Converting {total} tickets to Kapa.ai format...")
 
     # Kapa index: flat array of {object_key, source_url}
     index_data: List[Dict[str, str]] = []
-
-    for i, ticket in enumerate(tickets, 1):
-        try:
-            issue = ticket.get("issue", {})
-            comments = ticket.get("comments", [])
-
-            # Basic issue info
-            identifier = issue.get("identifier", f"ISSUE-{i}")
-            number = issue.get("number", i)
-            title = issue.get("title", f"Issue {number}")
-            description = issue.get("description", "")
-            url = issue.get("url", "")
-            created_at = issue.get("createdAt", "")
-            completed_at = issue.get("completedAt", "")
-            priority_label = issue.get("priorityLabel", "")
-
-            # State info
-            state_info = issue.get("state", {})
-            state_name = state_info.get("name", "Unknown")
-
-            # Team info
-            team_info = issue.get("team", {})
-            team_name = team_info.get("name", "")
-
-            # Assignee / Creator
-            assignee = issue.get("assignee", {}) or {}
-            creator = issue.get("creator", {}) or {}
-
-            # Labels
-            labels_data = issue.get("labels", {}).get("nodes", [])
-            label_names = [l.get("name", "") for l in labels_data if l.get("name")]
-
-            # Project / Cycle
-            project = issue.get("project", {}) or {}
-            cycle = issue.get("cycle", {}) or {}
-
-            # Create filename
-            filename = f"{identifier}_{clean_filename(title)}.md"
-            filepath = os.path.join(output_dir, filename)
-
-            # ── Build markdown following Kapa best practices ──
-            # Modelled after the support ticket example in:
-            # https://docs.kapa.ai/data-sources/faq#how-should-i-format-markdown-files-for-ai-ingestion
-            md = []
-
-            # H1 — ticket header
-            md.append(f"# Linear Issue: {identifier} — {title}")
-            md.append("")
-
-            # Metadata as bold key-value pairs (Kapa recommended style)
-            md.append(f"**Timestamp**: {format_timestamp(created_at)}")
-            md.append("")
-            md.append(f"**Status**: {state_name}")
-            md.append("")
-            if completed_at:
-                md.append(f"**Completed**: {format_timestamp(completed_at)}")
-                md.append("")
-            if team_name:
-                md.append(f"**Team**: {team_name}")
-                md.append("")
-            if priority_label:
-                md.append(f"**Priority**: {priority_label}")
-                md.append("")
-            if assignee.get("name"):
-                md.append(f"**Assignee**: {assignee['name']}")
-                md.append("")
-            if creator.get("name"):
-                md.append(f"**Creator**: {creator['name']}")
-                md.append("")
-            if label_names:
-                md.append(f"**Tags**: {', '.join(label_names)}")
-                md.append("")
-            if project.get("name"):
-                md.append(f"**Project**: {project['name']}")
-                md.append("")
-            if cycle.get("name"):
-                md.append(f"**Cycle**: {cycle['name']} (#{cycle.get('number', '')})")
-                md.append("")
-
-            # H2 — Issue description
-            md.append("## Issue description")
-            md.append("")
-            if description:
-                md.append(description)
-            else:
-                md.append("No description provided.")
-            md.append("")
-
-            # H2 — Conversation (comments)
-            if comments:
-                md.append("## Conversation")
-                md.append("")
-
-                for comment in comments:
-                    comment_body = comment.get("body", "")
-                    comment_created = comment.get("createdAt", "")
-                    comment_user = comment.get("user", {}) or {}
-                    bot_actor = comment.get("botActor", {}) or {}
-
-                    # Determine author
-                    if bot_actor.get("name"):
-                        author_name = f"{bot_actor['name']} (Bot)"
-                    elif comment_user.get("name"):
-                        author_name = comment_user["name"]
-                    else:
-                        author_name = "Unknown"
-
-                    # Each comment as bold author + timestamp, then body
-                    md.append(f"**{author_name}**: {comment_body if comment_body else '_No body content._'}")
-                    md.append("")
-
-            # Write the markdown file
-            full_markdown = "\n".join(md)
-
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(full_markdown)
-
-            # Add to Kapa index (flat format: object_key + source_url)
-            if url:
-                index_data.append({
-                    "object_key": filename,
-                    "source_url": url,
-                })
-
-            if i % 50 == 0:
-                print(f"  Processed {i}/{len(tickets)} tickets...")
-
-        except Exception as e:
-            print(f"  Error processing ticket {i}: {str(e)}")
-            continue
-
-    # Write index.json — flat array as required by Kapa
+    processed = 0
+
+    # Tickets are independent, so spread the markdown rendering and file
+    # writes across processes (bypassing the GIL); map() keeps index order
+    # and chunksize amortizes the pickling round trips. Tickets are fed in
+    # bounded chunks so a streamed export is never fully loaded.
+    numbers = count(1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            chunk = list(islice(tickets, CONVERT_CHUNK_SIZE))
+            if not chunk:
+                break
+
+            results = executor.map(
+                _convert_ticket,
+                chunk,
+                islice(numbers, len(chunk)),
+                repeat(output_dir),
+                chunksize=64,
+            )
+            for index_entry in results:
+                processed += 1
+                if index_entry:
+                    index_data.append(index_entry)
+
+                if processed % 50 == 0:
+                    print(f"  Processed {processed}/{total} tickets...")
+
+    # Write index.json — flat array as required by Kapa. An incremental
+    # export only holds the issues updated since the last run, so entries
+    # from earlier runs into the same directory are kept, unless this run
+    # re-exported the same issue (matched by URL: the filename changes
+    # when the title does) or rewrote the same file.
     index_path = os.path.join(output_dir, "index.json")
-    with open(index_path, "w", encoding="utf-8") as f:
-        json.dump(index_data, f, indent=2, ensure_ascii=False)
+    if metadata.get("updated_after") and os.path.exists(index_path):
+        with open(index_path, "rb") as f:
+            previous_index = json_loads(f.read())
+        new_keys = {entry["object_key"] for entry in index_data}
+        new_urls = {entry["source_url"] for entry in index_data}
+        kept = []
+        for entry in previous_index:
+            object_key = entry.get("object_key")
+            if entry.get("source_url") in new_urls or object_key in new_keys:
+                # Superseded: remove the old file if it was written under
+                # a different name (e.g. the issue was renamed)
+                if object_key and object_key not in new_keys:
+                    try:
+                        os.remove(os.path.join(output_dir, object_key))
+                    except FileNotFoundError:
+                        pass
+                continue
+            kept.append(entry)
+        if kept:
+            print(f"  Keeping {len(kept)} index entries from a previous run")
+        index_data = kept + index_data
+
+    if orjson is not None:
+        with open(index_path, "wb") as f:
+            f.write(orjson.dumps(index_data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(index_path, "w", encoding="utf-8") as f:
+            json.dump(index_data, f, indent=2, ensure_ascii=False)
 
     print(f"\n✅ Conversion completed!")
     print(f"📁 Output directory: {output_dir}")
-    print(f"📄 Files created: {len(tickets)} markdown files + index.json")
+    print(f"📄 Files created: {processed} markdown files + index.json")
 
     return index_data
 
@@ -210,9 +321,9 @@ def main():
     import sys
 
     if len(sys.argv) < 2:
-        print("Usage: python linear_to_kapa.py <linear_json_file> [output_directory]")
+        print("Usage: python linear_to_kapa.py <linear_export_file> [output_directory]")
         print(
-            "Example: python linear_to_kapa.py linear_closed_tickets_20250603_164324.json linear_tickets"
+            "Example: python linear_to_kapa.py linear_closed_tickets_20250603_164324.ndjson.gz linear_tickets"
         )
         return
 
@@ -1,47 +1,153 @@
+import os
+import hashlib
+import threading
+import time
 import requests
 import json
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+try:
+    import orjson  # Optional: much faster JSON parse/serialize
+except ImportError:
+    orjson = None
+
+
+# Cached entries for issues that aren't closed yet may still change
+OPEN_ISSUE_CACHE_TTL = 30 * 24 * 60 * 60
+
+# Issue fields pylon_to_kapa reads. When a search result already carries all
+# of them, the per-issue details request adds nothing and is skipped.
+_REQUIRED_DETAIL_KEYS = frozenset({"custom_fields", "body_html", "link", "title", "state"})
+
+
+def json_loads(data: bytes) -> Any:
+    """
+    Parse JSON bytes, using orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any) -> bytes:
+    """
+    Serialize to compact UTF-8 JSON bytes, using orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+class DiskCache:
+    """
+    Minimal on-disk cache storing one JSON file per key.
+
+    Each entry can carry its own expiry (None never expires). Writes go
+    through a temp file and an atomic rename, so concurrent threads never
+    read a partially written entry.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            with open(self._path(key), "rb") as f:
+                entry = json_loads(f.read())
+        except (OSError, ValueError):
+            return None
+        if entry.get("expires_at") is not None and entry["expires_at"] < time.time():
+            return None
+        return entry.get("value")
+
+    def set(self, key: str, value: Any, expire: Optional[float] = None) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        entry = {
+            "expires_at": time.time() + expire if expire is not None else None,
+            "value": value,
+        }
+        with open(tmp_path, "wb") as f:
+            f.write(json_dumps(entry))
+        os.replace(tmp_path, path)
 
 
 class PylonAPIClient:
-    def __init__(self, api_token: str):
+    def __init__(
+        self,
+        api_token: str,
+        cache_dir: Optional[str] = None,
+        max_connections: int = 32,
+        verbose: bool = False,
+    ):
         """
         Initialize Pylon API client
 
         Args:
             api_token: Your Pylon API token (keep this secure!)
+            cache_dir: Optional directory for caching issue details and
+                messages between runs, keyed by issue ID + updated_at
+            max_connections: Keep-alive connections kept open to the API;
+                should be at least the number of concurrent fetch workers
+            verbose: Print a line per ticket instead of periodic progress
         """
         self.api_token = api_token
+        self.verbose = verbose
         self.base_url = "https://api.usepylon.com"
         self.headers = {
-            "Authorization": f"Bearer <TOKEN>",
+            "Authorization": f"Bearer {api_token}",
             "Content-Type": "application/json",
             "Accept": "application/json",
         }
 
-    def get_issues_in_range(
-        self, start_time: datetime, end_time: datetime
-    ) -> List[Dict[str, Any]]:
+        # One pooled session for every request: keep-alive avoids a fresh
+        # DNS + TCP + TLS handshake per call. All calls are reads (search is
+        # a POST but has no side effects), so they are safe to retry on
+        # transient 429/5xx responses.
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        retries = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset({"GET", "POST"}),
+            raise_on_status=False,
+        )
+        # pool_block makes a thread wait for a free connection instead of
+        # opening a one-off connection that is thrown away after the call
+        adapter = HTTPAdapter(
+            pool_connections=max_connections,
+            pool_maxsize=max_connections,
+            pool_block=True,
+            max_retries=retries,
+        )
+        self.session.mount("https://", adapter)
+
+        # Closed tickets rarely change, so re-runs can reuse what the last
+        # export fetched instead of calling the API again
+        self.cache = DiskCache(cache_dir) if cache_dir else None
+
+    def _search_issues_page(self, search_payload: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Get issues using the direct GET endpoint with time range
+        Fetch a single page from the issues search endpoint
 
         Args:
-            start_time: Start time for the range (max 30 days from end_time)
-            end_time: End time for the range
+            search_payload: Search request body, including the page cursor
 
         Returns:
-            List of issues in the specified time range
+            Raw response body (data + pagination meta)
         """
-        # Format dates as RFC3339
-        start_str = start_time.isoformat() + "Z"
-        end_str = end_time.isoformat() + "Z"
-
-        # Use the GET endpoint with time range parameters
-        params = {"start_time": start_str, "end_time": end_str}
-
-        response = requests.get(
-            f"{self.base_url}/issues", headers=self.headers, params=params
+        response = self.session.post(
+            f"{self.base_url}/issues/search",
+            json=search_payload,
         )
 
         if response.status_code != 200:
@@ -49,52 +155,59 @@ class PylonAPIClient:
                 f"API request failed: {response.status_code} - {response.text}"
             )
 
-        return response.json().get("data", [])
+        return json_loads(response.content)
 
-    def search_closed_issues_only(self) -> List[Dict[str, Any]]:
+    def search_closed_issues_only(self, created_after: datetime) -> Iterator[Dict[str, Any]]:
         """
-        Search for closed issues using the search endpoint with just state filter
+        Search for closed issues created after a given time
+
+        Both the state and the time filter are applied by the API, so only
+        issues in the requested window are transferred. Issues are yielded
+        page by page. As soon as a page arrives, the next
+        one is requested in the background, so the API round trip overlaps
+        with whatever the caller does with the current page.
+
+        Args:
+            created_after: Only return issues created after this (timezone-aware) time
 
         Returns:
-            List of closed issues
+            Iterator over closed issues
         """
         search_payload = {
-            "filter": {"field": "state", "operator": "equals", "value": "closed"},
-            "limit": 100,
+            "filter": {
+                "operator": "and",
+                "subfilters": [
+                    {"field": "state", "operator": "equals", "value": "closed"},
+                    {
+                        "field": "created_at",
+                        "operator": "time_is_after",
+                        "value": created_after.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    },
+                ],
+            },
+            # Largest page the search endpoint serves; fewer round trips
+            "limit": 500,
         }
 
-        all_issues = []
-        cursor = None
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            next_page = prefetcher.submit(self._search_issues_page, search_payload)
 
-        while True:
-            if cursor:
-                search_payload["cursor"] = cursor
+            while next_page is not None:
+                result = next_page.result()
+                issues = result.get("data", [])
 
-            response = requests.post(
-                f"{self.base_url}/issues/search",
-                headers=self.headers,
-                json=search_payload,
-            )
+                if not issues:
+                    break
 
-            if response.status_code != 200:
-                raise Exception(
-                    f"API request failed: {response.status_code} - {response.text}"
+                # Check for next page and start fetching it right away
+                cursor = result.get("meta", {}).get("cursor")
+                next_page = (
+                    prefetcher.submit(self._search_issues_page, {**search_payload, "cursor": cursor})
+                    if cursor
+                    else None
                 )
 
-            result = response.json()
-            issues = result.get("data", [])
-
-            if not issues:
-                break
-
-            all_issues.extend(issues)
-
-            # Check for next page
-            cursor = result.get("meta", {}).get("cursor")
-            if not cursor:
-                break
-
-        return all_issues
+                yield from issues
 
     def get_issue_details(self, issue_id: str) -> Dict[str, Any]:
         """
@@ -106,16 +219,14 @@ class PylonAPIClient:
         Returns:
             Detailed issue information
         """
-        response = requests.get(
-            f"{self.base_url}/issues/{issue_id}", headers=self.headers
-        )
+        response = self.session.get(f"{self.base_url}/issues/{issue_id}")
 
         if response.status_code != 200:
             raise Exception(
                 f"Failed to fetch issue {issue_id}: {response.status_code} - {response.text}"
             )
 
-        return response.json()
+        return json_loads(response.content)
 
     def get_issue_messages(self, issue_id: str) -> List[Dict[str, Any]]:
         """
@@ -127,9 +238,7 @@ class PylonAPIClient:
         Returns:
             List of messages for the issue
         """
-        response = requests.get(
-            f"{self.base_url}/issues/{issue_id}/messages", headers=self.headers
-        )
+        response = self.session.get(f"{self.base_url}/issues/{issue_id}/messages")
 
         if response.status_code != 200:
             print(
@@ -137,11 +246,11 @@ class PylonAPIClient:
             )
             return []
 
-        return response.json().get("data", [])
+        return json_loads(response.content).get("data", [])
 
     def filter_issues_by_date_and_state(
         self,
-        issues: List[Dict],
+        issues: Iterable[Dict],
         start_date: datetime,
         end_date: datetime,
         state: str = "closed",
@@ -150,9 +259,9 @@ class PylonAPIClient:
         Filter issues by date range and state
 
         Args:
-            issues: List of issues to filter
-            start_date: Start date for filtering
-            end_date: End date for filtering
+            issues: Issues to filter (any iterable, consumed once)
+            start_date: Start date for filtering (timezone-aware)
+            end_date: End date for filtering (timezone-aware)
             state: State to filter by
 
         Returns:
@@ -160,119 +269,146 @@ class PylonAPIClient:
         """
         filtered_issues = []
 
+        # Compare plain POSIX timestamps: cheaper than datetime comparisons
+        # and immune to naive/aware mismatches
+        start_ts = start_date.timestamp()
+        end_ts = end_date.timestamp()
+
         for issue in issues:
             # Check state
             if issue.get("state") != state:
                 continue
 
-            # Check date - try multiple date fields
-            issue_date = None
-            for date_field in ["created_at", "updated_at", "closed_at"]:
-                if date_field in issue and issue[date_field]:
-                    try:
-                        # Parse the date string
-                        date_str = issue[date_field].replace("Z", "+00:00")
-                        issue_date = datetime.fromisoformat(date_str.replace("Z", ""))
-                        break
-                    except:
-                        continue
-
-            if issue_date and start_date <= issue_date <= end_date:
+            # Check date - use the first date field that parses
+            issue_ts = None
+            for date_field in ("created_at", "updated_at", "closed_at"):
+                value = issue.get(date_field)
+                # Anything shorter than YYYY-MM-DD can't be a timestamp
+                if not isinstance(value, str) or len(value) < 10:
+                    continue
+                try:
+                    issue_date = datetime.fromisoformat(value.replace("Z", "+00:00"))
+                except ValueError:
+                    continue
+                if issue_date.tzinfo is None:
+                    issue_date = issue_date.replace(tzinfo=timezone.utc)
+                issue_ts = issue_date.timestamp()
+                break
+
+            if issue_ts is not None and start_ts <= issue_ts <= end_ts:
                 filtered_issues.append(issue)
 
         return filtered_issues
 
-    def fetch_all_closed_tickets(self, days_back: int = 180) -> Dict[str, Any]:
+    def _fetch_ticket(self, issue: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Fetch details and messages for a single issue
+
+        Args:
+            issue: Issue summary from the list/search endpoint
+
+        Returns:
+            (complete ticket, None) on success, or (None, error message)
+        """
+        issue_id = issue["id"]
+
+        cache_key = None
+        if self.cache is not None:
+            version = issue.get("updated_at") or issue.get("closed_at") or ""
+            cache_key = hashlib.md5(f"{issue_id}:{version}".encode("utf-8")).hexdigest()
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                detailed_issue, messages = cached
+                return {
+                    "issue": {**issue, **detailed_issue.get("data", {})},
+                    "messages": messages,
+                    "total_messages": len(messages),
+                }, None
+
+        try:
+            # Get detailed issue information, unless the summary has it all
+            if _REQUIRED_DETAIL_KEYS.issubset(issue.keys()):
+                detailed_issue = {}
+            else:
+                detailed_issue = self.get_issue_details(issue_id)
+
+            # Get all messages for this issue
+            messages = self.get_issue_messages(issue_id)
+        except Exception as e:
+            return None, str(e)
+
+        # get_issue_messages returns [] when the request fails, so only cache
+        # tickets that came back with messages (every real ticket has one)
+        if cache_key is not None and messages:
+            expire = None if issue.get("state") == "closed" else OPEN_ISSUE_CACHE_TTL
+            self.cache.set(cache_key, [detailed_issue, messages], expire=expire)
+
+        # Combine all data. Details overlap heavily with the summary, so the
+        # issue is stored once with the detail fields merged over it.
+        complete_ticket = {
+            "issue": {**issue, **detailed_issue.get("data", {})},
+            "messages": messages,
+            "total_messages": len(messages),
+        }
+        return complete_ticket, None
+
+    def fetch_all_closed_tickets(self, days_back: int = 180, max_workers: int = 16) -> Dict[str, Any]:
         """
         Fetch all closed tickets from the last N days with complete metadata and messages
 
         Args:
             days_back: Number of days to look back (default: 90)
+            max_workers: Number of tickets fetched concurrently (default: 16)
 
         Returns:
             Complete dataset of closed tickets with all metadata and messages
         """
-        end_date = datetime.now()
+        end_date = datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=days_back)
 
         print(
             f"Fetching closed tickets from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}"
         )
 
-        # First, try to get all closed issues using the search endpoint
-        print("Fetching all closed issues...")
-        try:
-            all_closed_issues = self.search_closed_issues_only()
-            print(f"Found {len(all_closed_issues)} total closed issues")
-
-            # Filter by date range
-            filtered_issues = self.filter_issues_by_date_and_state(
-                all_closed_issues, start_date, end_date, "closed"
-            )
-            print(f"Filtered to {len(filtered_issues)} closed issues in date range")
-
-        except Exception as e:
-            print(f"Search method failed: {e}")
-            print("Trying alternative approach with time-based chunks...")
+        # State and date are filtered by the API. The same check is repeated
+        # locally as a cheap guard, so a filter the API ignores or interprets
+        # differently can't let tickets outside the window into the export.
+        print("Fetching closed issues in date range...")
+        filtered_issues = self.filter_issues_by_date_and_state(
+            self.search_closed_issues_only(start_date), start_date, end_date, "closed"
+        )
+        print(f"Found {len(filtered_issues)} closed issues in date range")
 
-            # Alternative: fetch in 30-day chunks
-            filtered_issues = []
-            current_end = end_date
+        issues = [issue for issue in filtered_issues if issue.get("id")]
+        print(f"\nProcessing {len(issues)} closed tickets ({max_workers} workers)...")
 
-            while current_end > start_date:
-                current_start = max(start_date, current_end - timedelta(days=30))
+        skipped_details = sum(1 for issue in issues if _REQUIRED_DETAIL_KEYS.issubset(issue.keys()))
+        if skipped_details:
+            print(f"  {skipped_details} tickets already have full details; skipping those detail requests")
 
-                print(
-                    f"Fetching issues from {current_start.strftime('%Y-%m-%d')} to {current_end.strftime('%Y-%m-%d')}"
-                )
-
-                try:
-                    chunk_issues = self.get_issues_in_range(current_start, current_end)
-                    closed_in_chunk = [
-                        issue
-                        for issue in chunk_issues
-                        if issue.get("state") == "closed"
-                    ]
-                    filtered_issues.extend(closed_in_chunk)
-                    print(f"  Found {len(closed_in_chunk)} closed issues in this chunk")
-                except Exception as chunk_error:
-                    print(f"  Error fetching chunk: {chunk_error}")
-
-                current_end = current_start
-
-        print(f"\nProcessing {len(filtered_issues)} closed tickets...")
-
-        # Now get detailed information for each issue
+        # Now get detailed information for each issue. Each ticket costs up to two
+        # blocking GETs, so run them on a thread pool; map() keeps order.
         all_tickets = []
 
-        for i, issue in enumerate(filtered_issues, 1):
-            issue_id = issue.get("id")
-            if not issue_id:
-                continue
-
-            try:
-                print(f"  Processing ticket {i}/{len(filtered_issues)}: {issue_id}")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(self._fetch_ticket, issues)
+            for i, (issue, (complete_ticket, error)) in enumerate(zip(issues, results), 1):
+                issue_id = issue["id"]
 
-                # Get detailed issue information
-                detailed_issue = self.get_issue_details(issue_id)
+                # Errors are always reported; everything else is either a
+                # line per ticket (verbose) or a line every 50 tickets
+                if self.verbose:
+                    print(f"  Processing ticket {i}/{len(issues)}: {issue_id}")
+                elif i % 50 == 0:
+                    print(f"  Processed {i}/{len(issues)} tickets...")
 
-                # Get all messages for this issue
-                messages = self.get_issue_messages(issue_id)
-
-                # Combine all data
-                complete_ticket = {
-                    "issue_summary": issue,
-                    "issue_details": detailed_issue,
-                    "messages": messages,
-                    "total_messages": len(messages),
-                }
+                if error:
+                    print(f"    ✗ Error processing ticket {issue_id}: {error}")
+                    continue
 
                 all_tickets.append(complete_ticket)
-                print(f"    ✓ Processed ({len(messages)} messages)")
-
-            except Exception as e:
-                print(f"    ✗ Error processing ticket {issue_id}: {str(e)}")
-                continue
+                if self.verbose:
+                    print(f"    ✓ Processed ({complete_ticket['total_messages']} messages)")
 
         result = {
             "metadata": {
@@ -281,7 +417,7 @@ class PylonAPIClient:
                     "start": start_date.isoformat(),
                     "end": end_date.isoformat(),
                 },
-                "fetched_at": datetime.now().isoformat(),
+                "fetched_at": datetime.now(timezone.utc).isoformat(),
                 "days_back": days_back,
             },
             "tickets": all_tickets,
@@ -300,13 +436,21 @@ def main():
     # IMPORTANT: Replace with your NEW API token (after revoking the old one)
     API_TOKEN = "XXX"
 
-    # Initialize the client
-    client = PylonAPIClient(API_TOKEN)
+    # Initialize the client. Issue details and messages are cached in
+    # .pylon_cache/ between runs; set PYLON_NO_CACHE=1 to always hit the API
+    no_cache = os.environ.get("PYLON_NO_CACHE", "").lower() in ("true", "1", "yes")
+    max_workers = int(os.environ.get("PYLON_MAX_WORKERS", "16"))
+    client = PylonAPIClient(
+        API_TOKEN,
+        cache_dir=None if no_cache else ".pylon_cache",
+        max_connections=max_workers,
+        verbose=os.environ.get("PYLON_VERBOSE", "").lower() in ("true", "1", "yes"),
+    )
 
     try:
         # Test API connection first
         print("Testing API connection...")
-        test_response = requests.get(f"{client.base_url}/me", headers=client.headers)
+        test_response = client.session.get(f"{client.base_url}/me")
 
         if test_response.status_code != 200:
             raise Exception(
@@ -318,14 +462,18 @@ def main():
         print(f"Organization: {org_data.get('data', {}).get('name', 'Unknown')}")
 
         # Fetch all closed tickets from last 90 days
-        all_data = client.fetch_all_closed_tickets(days_back=180)
+        all_data = client.fetch_all_closed_tickets(days_back=180, max_workers=max_workers)
 
         # Save to JSON file
         output_filename = (
             f"pylon_closed_tickets_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         )
-        with open(output_filename, "w", encoding="utf-8") as f:
-            json.dump(all_data, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            with open(output_filename, "wb") as f:
+                f.write(orjson.dumps(all_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_filename, "w", encoding="utf-8") as f:
+                json.dump(all_data, f, indent=2, ensure_ascii=False)
 
         print(f"\n💾 Data saved to: {output_filename}")
         print(f"📊 Summary:")
@@ -338,13 +486,7 @@ def main():
         if all_data["tickets"]:
             sample_ticket = all_data["tickets"][0]
             print(f"   • Sample ticket keys: {list(sample_ticket.keys())}")
-            if "issue_details" in sample_ticket and sample_ticket["issue_details"]:
-                detail_keys = (
-                    list(sample_ticket["issue_details"].get("data", {}).keys())
-                    if isinstance(sample_ticket["issue_details"], dict)
-                    else []
-                )
-                print(f"   • Sample issue detail keys: {detail_keys}")
+            print(f"   • Sample issue keys: {list(sample_ticket['issue'].keys())}")
 
     except Exception as e:
         print(f"❌ Error: {str(e)}")
@@ -1,218 +1,299 @@
 import json
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Any
+from functools import lru_cache
+from itertools import repeat
+from typing import Dict, List, Any, Optional
 from html import unescape
 import html2text
 
+try:
+    import orjson  # Optional: much faster JSON parse/serialize
+except ImportError:
+    orjson = None
+
+# Patterns reused for every ticket and message
+_MULTI_NL = re.compile(r"\n{3,}")
+_TAGS = re.compile(r"<[^>]+>")
+# Filesystem-unsafe characters -> "_" in a single translate() pass
+_TRANS = str.maketrans({c: "_" for c in '<>:"/\\|?*'})
+_WS = re.compile(r"\s+")
+# Tags, entities and backslashes need html2text's full treatment, as do
+# lines starting with something it escapes as a list marker ("1.", "-", "+")
+_NEEDS_HTML2TEXT = re.compile(r"[<&\\]")
+_LIST_MARKER = re.compile(r"^\s*(?:\d+\.|[-+])", re.M)
+
+
+def json_loads(data: bytes) -> Any:
+    """
+    Parse JSON bytes, using orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any) -> bytes:
+    """
+    Serialize to compact UTF-8 JSON bytes, using orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
 def clean_filename(filename: str) -> str:
     """
     Clean filename to be filesystem-safe
     """
     # Remove HTML tags and convert to plain text
-    filename = re.sub(r"<[^>]+>", "", filename)
+    filename = _TAGS.sub("", filename)
     # Replace problematic characters
-    filename = re.sub(r'[<>:"/\\|?*]', "_", filename)
+    filename = filename.translate(_TRANS)
     # Remove extra whitespace and truncate if too long
-    filename = re.sub(r"\s+", "_", filename.strip())
+    filename = _WS.sub("_", filename.strip())
     return filename[:100]  # Truncate to 100 chars
 
 
+@lru_cache(maxsize=4096)
+def _html_to_markdown_cached(html_content: str) -> str:
+    # A converter keeps parser state between handle() calls (e.g. after a
+    # table), so each conversion gets a fresh one. bodywidth=0 keeps
+    # paragraphs on one line instead of wrapping at 78 chars.
+    h = html2text.HTML2Text(bodywidth=0).handle(html_content)
+
+    # Clean up the markdown
+    # Remove excessive newlines
+    h = _MULTI_NL.sub("\n\n", h)
+
+    return h.strip()
+
+
 def html_to_markdown(html_content: str) -> str:
     """
     Convert HTML content to clean markdown
+
+    Results are memoized: signatures, auto-replies and canned responses
+    repeat across a conversation and are only converted once per worker.
     """
     if not html_content:
         return ""
 
-    # Initialize html2text converter
-    h = html2text.html2text(html_content)
+    # Many bodies are plain text without tags or entities; for those
+    # html2text only collapses whitespace, so skip the HTML parse
+    if not _NEEDS_HTML2TEXT.search(html_content) and not _LIST_MARKER.search(html_content):
+        return _WS.sub(" ", html_content).strip()
 
-    # Clean up the markdown
-    # Remove excessive newlines
-    h = re.sub(r"\n{3,}", "\n\n", h)
+    return _html_to_markdown_cached(html_content)
 
-    return h.strip()
 
+def format_message(message: Dict[str, Any]) -> str:
+    """
+    Render one conversation message: author header, timestamp, body and
+    attachments, followed by a horizontal rule
+    """
+    # Get message details
+    msg_html = message.get("message_html", "")
+    timestamp = message.get("timestamp", "")
+    author_info = message.get("author", {})
+    is_private = message.get("is_private", False)
+
+    # Determine author name
+    author_name = author_info.get("name", "Unknown")
+
+    # Determine if it's from customer or support team
+    if "contact" in author_info:
+        author_type = "Customer"
+    elif "user" in author_info:
+        author_type = "Support"
+    else:
+        author_type = "Unknown"
+
+    privacy_indicator = " (Private)" if is_private else ""
+    timestamp_line = f"*{timestamp}*\n" if timestamp else ""
+    body = f"{html_to_markdown(msg_html)}\n" if msg_html else ""
+
+    # Add file attachments if any
+    file_urls = message.get("file_urls", [])
+    attachments = (
+        "\n**Attachments:**\n" + "".join(f"- {file_url}\n" for file_url in file_urls)
+        if file_urls
+        else ""
+    )
+
+    return (
+        f"\n### {author_type}: {author_name}{privacy_indicator}\n"
+        f"{timestamp_line}\n{body}{attachments}\n---\n"
+    )
+
+
+def _convert_one_ticket(ticket: Dict[str, Any], i: int, output_dir: str) -> Optional[Dict[str, Any]]:
+    """
+    Write the markdown file for a single ticket and return its index entry.
+
+    Runs in a worker process, so the rendered markdown never has to be
+    sent back to the parent. Returns None when the ticket could not be
+    converted.
+    """
+    try:
+        # Extract ticket information
+        # Exports store the issue once under "issue"; older ones kept the
+        # search result under "issue_summary"
+        issue = ticket.get("issue") or ticket.get("issue_summary", {})
+        messages = ticket.get("messages", [])
+
+        # Get basic ticket info
+        ticket_id = issue.get("id", f"unknown_{i}")
+        ticket_number = issue.get("number", i)
+        title = issue.get("title", f"Ticket {ticket_number}")
+        state = issue.get("state", "unknown")
+        link = issue.get("link", "")
+        created_at = issue.get("created_at", "")
+
+        # Create filename
+        filename = f"{ticket_number}_{clean_filename(title)}.md"
+        filepath = os.path.join(output_dir, filename)
+
+        # Custom fields carrying a "values" list, collected once for both
+        # the markdown and the index entry
+        custom_fields = [
+            (field_name, field_data["values"])
+            for field_name, field_data in (issue.get("custom_fields") or {}).items()
+            if isinstance(field_data, dict) and "values" in field_data
+        ]
+
+        # Metadata lines, skipping fields that are empty
+        metadata = [
+            f"**Created:** {created_at}" if created_at else "",
+            f"**Pylon Link:** {link}" if link else "",
+            *(
+                f"**{field_name.replace('_', ' ').title()}:** {', '.join(values)}"
+                for field_name, values in custom_fields
+                if values
+            ),
+        ]
+        metadata_block = "".join(f"{line}\n" for line in metadata if line)
+
+        # Write the markdown straight to the file, section by section,
+        # rather than assembling the whole document in memory first
+        with open(filepath, "w", encoding="utf-8") as f:
+            # Header and metadata
+            f.write(f"# Support Ticket: {title} - {state.title()}\n\n{metadata_block}\n---\n")
+
+            # Initial ticket body
+            initial_body = issue.get("body_html", "")
+            if initial_body:
+                f.write(f"\n## Initial Request\n\n{html_to_markdown(initial_body)}\n")
+
+            # Process messages (conversation thread)
+            if messages:
+                f.write("\n## Conversation\n")
+                f.writelines(format_message(message) for message in messages)
+
+        # Add to index
+        index_entry = {
+            "file_path": filename,
+            "title": f"Support Ticket #{ticket_number}: {title}",
+            "url": link if link else None,
+            "metadata": {
+                "ticket_id": ticket_id,
+                "ticket_number": ticket_number,
+                "state": state,
+                "created_at": created_at,
+                "total_messages": len(messages),
+                "source": "pylon_support_tickets",
+            },
+        }
+
+        # Add custom fields to metadata
+        for field_name, values in custom_fields:
+            index_entry["metadata"][field_name] = values
+
+        return index_entry
 
-def convert_pylon_to_kapa_format(input_file: str, output_dir: str = "pylon_tickets"):
+    except Exception as e:
+        print(f"  Error processing ticket {i}: {str(e)}")
+        return None
+
+
+def convert_pylon_to_kapa_format(
+    input_file: str,
+    output_dir: str = "pylon_tickets",
+    max_workers: Optional[int] = None,
+):
     """
     Convert Pylon JSON export to Kapa.ai S3 storage format
 
     Args:
         input_file: Path to the Pylon JSON file
         output_dir: Directory to create the Kapa.ai format files
+        max_workers: Number of worker processes (default: one per CPU)
+
+    Returns:
+        The index.json header (everything except the documents array)
     """
 
     # Create output directory
     os.makedirs(output_dir, exist_ok=True)
 
     # Load the Pylon data
-    with open(input_file, "r", encoding="utf-8") as f:
-        pylon_data = json.load(f)
+    with open(input_file, "rb") as f:
+        pylon_data = json_loads(f.read())
 
     tickets = pylon_data.get("tickets", [])
     metadata = pylon_data.get("metadata", {})
 
     print(f"Converting {len(tickets)} tickets to Kapa.ai format...")
 
-    # Index for Kapa.ai
-    index_data = []
-
-    for i, ticket in enumerate(tickets, 1):
-        try:
-            # Extract ticket information
-            issue_summary = ticket.get("issue_summary", {})
-            issue_details = ticket.get("issue_details", {}).get("data", {})
-            messages = ticket.get("messages", [])
-
-            # Get basic ticket info
-            ticket_id = issue_summary.get("id", f"unknown_{i}")
-            ticket_number = issue_summary.get("number", i)
-            title = issue_summary.get("title", f"Ticket {ticket_number}")
-            state = issue_summary.get("state", "unknown")
-            link = issue_summary.get("link", "")
-            created_at = issue_summary.get("created_at", "")
-
-            # Create filename
-            filename = f"{ticket_number}_{clean_filename(title)}.md"
-            filepath = os.path.join(output_dir, filename)
-
-            # Build the markdown content
-            markdown_content = []
-
-            # Header
-            markdown_content.append(f"# Support Ticket: {title} - {state.title()}")
-            markdown_content.append("")
-
-            # Metadata
-            if created_at:
-                markdown_content.append(f"**Created:** {created_at}")
-            if link:
-                markdown_content.append(f"**Pylon Link:** {link}")
-
-            # Add custom fields if available
-            custom_fields = issue_summary.get("custom_fields", {})
-            if custom_fields:
-                for field_name, field_data in custom_fields.items():
-                    if isinstance(field_data, dict) and "values" in field_data:
-                        values = field_data["values"]
-                        if values:
-                            markdown_content.append(
-                                f"**{field_name.replace('_', ' ').title()}:** {', '.join(values)}"
-                            )
-
-            markdown_content.append("")
-            markdown_content.append("---")
-            markdown_content.append("")
-
-            # Initial ticket body
-            initial_body = issue_summary.get("body_html", "")
-            if initial_body:
-                markdown_content.append("## Initial Request")
-                markdown_content.append("")
-                markdown_content.append(html_to_markdown(initial_body))
-                markdown_content.append("")
-
-            # Process messages (conversation thread)
-            if messages:
-                markdown_content.append("## Conversation")
-                markdown_content.append("")
-
-                for msg_idx, message in enumerate(messages):
-                    # Get message details
-                    msg_html = message.get("message_html", "")
-                    timestamp = message.get("timestamp", "")
-                    author_info = message.get("author", {})
-                    is_private = message.get("is_private", False)
-
-                    # Determine author name
-                    author_name = author_info.get("name", "Unknown")
-
-                    # Determine if it's from customer or support team
-                    if "contact" in author_info:
-                        author_type = "Customer"
-                    elif "user" in author_info:
-                        author_type = "Support"
-                    else:
-                        author_type = "Unknown"
-
-                    # Add message header
-                    privacy_indicator = " (Private)" if is_private else ""
-                    markdown_content.append(
-                        f"### {author_type}: {author_name}{privacy_indicator}"
-                    )
-                    if timestamp:
-                        markdown_content.append(f"*{timestamp}*")
-                    markdown_content.append("")
-
-                    # Add message content
-                    if msg_html:
-                        msg_markdown = html_to_markdown(msg_html)
-                        markdown_content.append(msg_markdown)
-
-                    # Add file attachments if any
-                    file_urls = message.get("file_urls", [])
-                    if file_urls:
-                        markdown_content.append("")
-                        markdown_content.append("**Attachments:**")
-                        for file_url in file_urls:
-                            markdown_content.append(f"- {file_url}")
-
-                    markdown_content.append("")
-                    markdown_content.append("---")
-                    markdown_content.append("")
-
-            # Write the markdown file
-            full_markdown = "\n".join(markdown_content)
-
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(full_markdown)
-
-            # Add to index
-            index_entry = {
-                "file_path": filename,
-                "title": f"Support Ticket #{ticket_number}: {title}",
-                "url": link if link else None,
-                "metadata": {
-                    "ticket_id": ticket_id,
-                    "ticket_number": ticket_number,
-                    "state": state,
-                    "created_at": created_at,
-                    "total_messages": len(messages),
-                    "source": "pylon_support_tickets",
-                },
-            }
-
-            # Add custom fields to metadata
-            if custom_fields:
-                for field_name, field_data in custom_fields.items():
-                    if isinstance(field_data, dict) and "values" in field_data:
-                        index_entry["metadata"][field_name] = field_data["values"]
-
-            index_data.append(index_entry)
+    # Index entries are appended to index.jsonl as tickets finish, so a
+    # crashed run still leaves a record of what was converted
+    index_jsonl_path = os.path.join(output_dir, "index.jsonl")
+    total_documents = 0
+
+    # Tickets are independent and the HTML -> markdown conversion is pure
+    # CPU, so spread them across processes; map() keeps index order
+    with ProcessPoolExecutor(max_workers=max_workers) as executor, open(
+        index_jsonl_path, "wb"
+    ) as index_jsonl:
+        results = executor.map(
+            _convert_one_ticket,
+            tickets,
+            range(1, len(tickets) + 1),
+            repeat(output_dir),
+            chunksize=16,
+        )
+        for i, index_entry in enumerate(results, 1):
+            if index_entry:
+                index_jsonl.write(json_dumps(index_entry) + b"\n")
+                total_documents += 1
 
             if i % 50 == 0:
                 print(f"  Processed {i}/{len(tickets)} tickets...")
 
-        except Exception as e:
-            print(f"  Error processing ticket {i}: {str(e)}")
-            continue
-
-    # Create index.json
+    # Create index.json. The header is serialized on its own and each
+    # index.jsonl line is copied into the "documents" array as-is, so the
+    # entries are never loaded back into memory.
     index_json = {
         "version": "1.0",
         "generated_at": datetime.now().isoformat(),
         "source": "pylon_support_tickets",
-        "total_documents": len(index_data),
+        "total_documents": total_documents,
         "original_metadata": metadata,
-        "documents": index_data,
     }
 
     index_path = os.path.join(output_dir, "index.json")
-    with open(index_path, "w", encoding="utf-8") as f:
-        json.dump(index_json, f, indent=2, ensure_ascii=False)
+    with open(index_path, "wb") as f, open(index_jsonl_path, "rb") as index_jsonl:
+        f.write(json_dumps(index_json)[:-1] + b',"documents":[')
+        separator = b""
+        for line in index_jsonl:
+            line = line.strip()
+            if line:
+                f.write(separator + line)
+                separator = b","
+        f.write(b"]}")
+    os.remove(index_jsonl_path)
 
     # Create a summary file
     summary_path = os.path.join(output_dir, "conversion_summary.md")
@@ -221,7 +302,7 @@ def convert_pylon_to_kapa_format(input_file: str, output_dir: str = "pylon_ticke
             f"""# Pylon to Kapa.ai Conversion Summary
 
 ## Conversion Details
-- **Total Tickets Processed:** {len(index_data)}
+- **Total Tickets Processed:** {total_documents}
 - **Conversion Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 - **Original Date Range:** {metadata.get('date_range', {}).get('start', 'Unknown')[:10]} to {metadata.get('date_range', {}).get('end', 'Unknown')[:10]}
 
@@ -248,7 +329,7 @@ Each ticket includes:
 
     print(f"\n✅ Conversion completed!")
     print(f"📁 Output directory: {output_dir}")
-    print(f"📄 Files created: {len(index_data)} markdown files + index.json")
+    print(f"📄 Files created: {total_documents} markdown files + index.json")
     print(f"📋 Summary: See {summary_path}")
 
     return index_json